@@ -1,131 +1,368 @@
 import os
 import asyncio
 import json
+import logging
+import queue
+import ssl
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
+from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, MessageHandler, ContextTypes, filters
 from telegram.error import Conflict, TelegramError
 import asyncpg
 import httpx
-from datetime import datetime, timezone
 
 load_dotenv()
 
+log = logging.getLogger('bot')
+
 # Database connection pool
 _db_pool = None
+DATABASE_URL = os.getenv('DATABASE_URL')
+# SSL is required for Neon. For local development on Windows, where certificate
+# verification can fail, set PGSSL_INSECURE=1 to skip hostname/certificate checks
+_DEFAULT_SSL = ssl.create_default_context()
+_INSECURE_SSL = ssl.create_default_context()
+_INSECURE_SSL.check_hostname = False
+_INSECURE_SSL.verify_mode = ssl.CERT_NONE
+DB_SSL = _INSECURE_SSL if os.getenv('PGSSL_INSECURE') == '1' else _DEFAULT_SSL
+# Few idle connections to keep Neon cheap, more headroom for bursts
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '20'))
+
+# In-process LRU of recently saved users: telegram_id -> (profile signature, last write time)
+# Lets chatty users skip the UPSERT when nothing changed and the last write is fresh
+_user_cache: "OrderedDict[int, tuple[int, float]]" = OrderedDict()
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 60.0  # seconds before last_active_at is refreshed again
+
+# Bloom filter of users queued in the current window, consulted when a user is not in the LRU:
+# filter hits are deferred to the end of the window instead of written right away, so the long
+# tail of users evicted from the cache is written at most once more per window
+SEEN_FILTER_BITS = 8192 * 8
+SEEN_FILTER_TTL = 300.0  # seconds before the filter is swapped for an empty one
+_seen_filter = bytearray(SEEN_FILTER_BITS // 8)
+# Filter hits waiting for the end of the window: telegram_id -> latest row.
+# A false positive only delays the write, and profile changes are kept
+_deferred_users: dict[int, tuple] = {}
+_seen_filter_task = None
+
+# Users waiting to be written by user_worker; created in post_init
+_user_q = None
+USER_QUEUE_SIZE = 10000  # users beyond this are dropped until the worker catches up
+USER_FLUSH_INTERVAL = 0.5  # seconds to collect a batch before writing it
+USER_FLUSH_BATCH = 200  # max rows per write; a full batch is written without waiting
+USER_SHUTDOWN_TIMEOUT = 20.0  # seconds shutdown waits for the remaining users to be written
+_batch_ready = None
+_user_worker_task = None
+_user_worker_stopping = False
+
+# Batch upsert: one array per column, unnested server-side into rows
+# Timestamps come from column defaults on insert and the users_touch trigger on update
+UPSERT_USERS_SQL = """
+    INSERT INTO users (telegram_id, username, first_name, last_name, language_code)
+    SELECT u.telegram_id, u.username, u.first_name, u.last_name, u.language_code
+    FROM unnest($1::bigint[], $2::varchar[], $3::varchar[], $4::varchar[], $5::varchar[])
+        AS u(telegram_id, username, first_name, last_name, language_code)
+    ON CONFLICT (telegram_id) 
+    DO UPDATE SET 
+        username = EXCLUDED.username,
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        language_code = EXCLUDED.language_code
+"""
+
+# Schema bootstrap is exempt from the pool's 10 s command_timeout: waiting for another
+# replica's migration, or adding the primary key on a large legacy table, can take longer
+SCHEMA_DDL_TIMEOUT = 600.0
+
+# True once create_schema has nothing left to do
+# to_regclass rather than ::regclass, which would raise while the table does not exist yet
+SCHEMA_CURRENT_SQL = """
+    SELECT to_regclass('public.users') IS NOT NULL
+        AND to_regclass('public.idx_users_telegram_id') IS NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = to_regclass('public.users') AND conname = 'users_telegram_id_key'
+        )
+        AND EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgrelid = to_regclass('public.users') AND tgname = 'users_touch'
+        )
+"""
 
 
-async def get_db_pool():
-    """Get or create database connection pool"""
+class BotConnection(asyncpg.Connection):
+    """Pool connection that keeps the user upsert as a server-side prepared statement"""
+    
+    _upsert_users_stmt = None
+    
+    async def upsert_users(self, rows):
+        # Prepared on first use rather than in the pool init callback,
+        # since the pool connects before init_db has created the users table
+        if self._upsert_users_stmt is None:
+            self._upsert_users_stmt = await self.prepare(UPSERT_USERS_SQL)
+        await self._upsert_users_stmt.fetch(*(list(column) for column in zip(*rows)))
+
+
+async def init_db_pool():
+    """Create database connection pool (once) and return it"""
     global _db_pool
     if _db_pool is None:
-        database_url = os.getenv('DATABASE_URL')
-        if not database_url:
+        if not DATABASE_URL:
             raise ValueError("DATABASE_URL environment variable is not set")
         
-        # For local development on Windows, handle SSL certificate issues
-        # In production (Railway), SSL will work fine
-        import ssl
-        
-        try:
-            # Try with SSL first (required for Neon)
-            ssl_context = ssl.create_default_context()
-            _db_pool = await asyncpg.create_pool(
-                database_url,
-                ssl=ssl_context
-            )
-        except Exception as e:
-            # If SSL fails on Windows, try with relaxed SSL settings
-            print(f"SSL connection failed with default context: {e}")
-            print("Trying with relaxed SSL settings for local development...")
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            try:
-                _db_pool = await asyncpg.create_pool(
-                    database_url,
-                    ssl=ssl_context
-                )
-            except Exception as e2:
-                print(f"SSL connection failed even with relaxed settings: {e2}")
-                raise
+        _db_pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            ssl=DB_SSL,
+            connection_class=BotConnection,
+            min_size=DB_POOL_MIN,
+            max_size=DB_POOL_MAX,
+            max_inactive_connection_lifetime=60.0,
+            command_timeout=10.0,
+            max_queries=50000,
+            # Session defaults for every pool connection: user tracking can afford to lose
+            # the last few commits on a crash, and JIT only adds startup cost to these small queries
+            server_settings={
+                'synchronous_commit': 'off',
+                'jit': 'off'
+            }
+        )
     return _db_pool
 
 
+async def create_schema(conn):
+    """Create or migrate the users table, its trigger and indexes"""
+    # Sent as one multi-statement script: a single round-trip instead of one per statement
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            telegram_id BIGINT PRIMARY KEY,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            language_code VARCHAR(10),
+            created_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours'),
+            updated_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours'),
+            last_active_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours')
+        );
+
+        -- Migrate tables created with id SERIAL PRIMARY KEY + UNIQUE telegram_id:
+        -- make telegram_id the primary key and drop the now-redundant indexes
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conrelid = 'public.users'::regclass AND conname = 'users_telegram_id_key'
+            ) THEN
+                ALTER TABLE users
+                    DROP CONSTRAINT users_pkey,
+                    DROP CONSTRAINT users_telegram_id_key,
+                    ADD PRIMARY KEY (telegram_id);
+            END IF;
+        END
+        $$;
+        DROP INDEX IF EXISTS idx_users_telegram_id;
+
+        -- Bump updated_at/last_active_at on every update, reading the clock once per row
+        -- All timestamps use UTC+3 timezone (Moscow time)
+        CREATE OR REPLACE FUNCTION touch_user() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := (now() AT TIME ZONE 'UTC') + INTERVAL '3 hours';
+            NEW.last_active_at := NEW.updated_at;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        CREATE OR REPLACE TRIGGER users_touch BEFORE UPDATE ON users
+        FOR EACH ROW EXECUTE FUNCTION touch_user();
+    """, timeout=SCHEMA_DDL_TIMEOUT)
+
+
 async def init_db():
     """Initialize database - create users table if it doesn't exist"""
-    pool = await get_db_pool()
+    pool = await init_db_pool()
     async with pool.acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                telegram_id BIGINT UNIQUE NOT NULL,
-                username VARCHAR(255),
-                first_name VARCHAR(255),
-                last_name VARCHAR(255),
-                language_code VARCHAR(10),
-                created_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours'),
-                updated_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours'),
-                last_active_at TIMESTAMP DEFAULT ((now() AT TIME ZONE 'UTC') + INTERVAL '3 hours')
-            )
-        """)
-        # Create index on telegram_id for faster lookups
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_users_telegram_id ON users(telegram_id)
-        """)
-        print("Database initialized: users table created/verified")
-
-
-async def save_user_async(update: Update):
-    """Save or update user in database asynchronously (non-blocking)"""
-    try:
-        pool = await get_db_pool()
-        user = update.effective_user
+        # Steady state: schema is already current, skip DDL and catalog locks entirely
+        if await conn.fetchval(SCHEMA_CURRENT_SQL):
+            log.info("Database initialized: users table verified")
+            return
         
-        async with pool.acquire() as conn:
-            # Use PostgreSQL's INSERT ... ON CONFLICT for atomic upsert in ONE query
-            # This is much faster than checking existence first
-            # All timestamps use UTC+3 timezone (Moscow time)
-            await conn.execute("""
-                INSERT INTO users (telegram_id, username, first_name, last_name, language_code, last_active_at)
-                VALUES ($1, $2, $3, $4, $5, (now() AT TIME ZONE 'UTC') + INTERVAL '3 hours')
-                ON CONFLICT (telegram_id) 
-                DO UPDATE SET 
-                    username = EXCLUDED.username,
-                    first_name = EXCLUDED.first_name,
-                    last_name = EXCLUDED.last_name,
-                    language_code = EXCLUDED.language_code,
-                    last_active_at = (now() AT TIME ZONE 'UTC') + INTERVAL '3 hours',
-                    updated_at = (now() AT TIME ZONE 'UTC') + INTERVAL '3 hours'
-            """, 
-                user.id,
-                user.username,
-                user.first_name,
-                user.last_name,
-                user.language_code
-            )
+        # Only one replica runs DDL at a time; the others wait, re-check and skip
+        await conn.execute("SELECT pg_advisory_lock(hashtext('users_ddl'))", timeout=SCHEMA_DDL_TIMEOUT)
+        try:
+            if not await conn.fetchval(SCHEMA_CURRENT_SQL):
+                await create_schema(conn)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext('users_ddl'))")
+        log.info("Database initialized: users table created/verified")
+
+
+def reset_seen_filter() -> None:
+    """Clear the seen-users filter"""
+    global _seen_filter
+    _seen_filter = bytearray(SEEN_FILTER_BITS // 8)
+
+
+def remember_user(telegram_id: int, sig: int, now: float) -> None:
+    """Record a queued user in the LRU"""
+    _user_cache[telegram_id] = (sig, now)
+    _user_cache.move_to_end(telegram_id)
+    if len(_user_cache) > USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+
+
+def queue_user(telegram_id: int, username, first_name, last_name, language_code) -> None:
+    """Queue user for the next batch write, skipping users saved recently with the same profile"""
+    sig = hash((username, first_name, last_name, language_code))
+    now = time.monotonic()
+    row = (telegram_id, username, first_name, last_name, language_code)
+    cached = _user_cache.get(telegram_id)
+    probes = None
+    if cached is not None:
+        if cached[0] == sig and now - cached[1] < USER_CACHE_TTL:
+            _user_cache.move_to_end(telegram_id)
+            return
+    else:
+        # Three probes into the filter; all set means the user was (almost certainly) queued this window
+        probes = [hash((salt, telegram_id)) % SEEN_FILTER_BITS for salt in (1, 2, 3)]
+        if all(_seen_filter[p >> 3] & (1 << (p & 7)) for p in probes) and (
+            telegram_id in _deferred_users or len(_deferred_users) < USER_QUEUE_SIZE
+        ):
+            _deferred_users[telegram_id] = row
+            return
+    
+    try:
+        _user_q.put_nowait(row)
+    except asyncio.QueueFull:
+        # Shed load instead of growing without bound; the user is queued again on their next message
+        return
+    # A newer row is queued now, so a deferred one must not be written after it
+    _deferred_users.pop(telegram_id, None)
+    if _user_q.qsize() >= USER_FLUSH_BATCH:
+        _batch_ready.set()
+    
+    if probes is not None:
+        for p in probes:
+            _seen_filter[p >> 3] |= 1 << (p & 7)
+    remember_user(telegram_id, sig, now)
+
+
+def roll_seen_filter() -> None:
+    """End the current window: clear the filter and queue the users deferred during it"""
+    reset_seen_filter()
+    rows = list(_deferred_users.values())
+    _deferred_users.clear()
+    now = time.monotonic()
+    for row in rows:
+        try:
+            _user_q.put_nowait(row)
+        except asyncio.QueueFull:
+            # The filter is empty now, so the rest are queued again on their next message
+            break
+        remember_user(row[0], hash(row[1:]), now)
+    if _user_q.qsize() >= USER_FLUSH_BATCH:
+        _batch_ready.set()
+
+
+async def seen_filter_loop():
+    """Background task: roll the seen-users window every SEEN_FILTER_TTL"""
+    while True:
+        await asyncio.sleep(SEEN_FILTER_TTL)
+        roll_seen_filter()
+
+
+async def save_users_async(rows):
+    """Upsert a batch of users in one round-trip using the connection's prepared statement"""
+    # Fast path: the pool normally exists after post_init, so no coroutine is awaited here;
+    # creating it lazily lets writes recover if the database was unreachable at startup
+    pool = _db_pool or await init_db_pool()
+    async with pool.acquire() as conn:
+        await conn.upsert_users(rows)
+
+
+async def flush_users(rows) -> bool:
+    """Write a batch of users to the database, returning whether it succeeded"""
+    try:
+        await save_users_async(rows)
+        return True
     except Exception as e:
-        print(f"Error saving user to database: {e}")
+        log.error("Error saving users to database: %s", e)
+        # Forget these users so their next message queues them again
+        for row in rows:
+            _user_cache.pop(row[0], None)
+        reset_seen_filter()
+        return False
+
+
+async def user_worker():
+    """Background task: collect queued users for up to USER_FLUSH_INTERVAL and write them in
+    batches of at most USER_FLUSH_BATCH rows.
+    
+    A None item asks the worker to write what is left and stop.
+    """
+    stopping = False
+    # Keyed by telegram_id, so repeated messages within one batch collapse to one row
+    batch = {}
+    while True:
+        if not stopping:
+            item = await _user_q.get()
+            if item is None:
+                stopping = True
+            else:
+                batch[item[0]] = item
+                # Wait for more users unless a full batch is already queued
+                _batch_ready.clear()
+                if _user_q.qsize() < USER_FLUSH_BATCH:
+                    try:
+                        await asyncio.wait_for(_batch_ready.wait(), USER_FLUSH_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+        
+        # Anything beyond one batch stays queued for the next round
+        while len(batch) < USER_FLUSH_BATCH and not _user_q.empty():
+            item = _user_q.get_nowait()
+            if item is None:
+                stopping = True
+            else:
+                batch[item[0]] = item
+        
+        if batch:
+            ok = await flush_users(list(batch.values()))
+            batch = {}
+            if not ok and (stopping or _user_worker_stopping):
+                # Database is unreachable: don't hold up shutdown retrying batch after batch
+                dropped = _user_q.qsize() + len(_deferred_users)
+                while not _user_q.empty():
+                    _user_q.get_nowait()
+                _deferred_users.clear()
+                log.warning("Dropping %d queued users on shutdown", dropped)
+                return
+        if stopping and _user_q.empty():
+            return
 
 
 async def ensure_user_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handler that ensures user exists in database (runs on all messages, non-blocking)"""
-    # Run database operation asynchronously without blocking the response
-    asyncio.create_task(save_user_async(update))
+    """Handler that ensures user exists in database (runs on user messages and button presses, non-blocking)"""
+    user = update.effective_user
+    if user is None:
+        return
+    # Only the profile fields are queued, so the Update can be freed as soon as it is handled;
+    # user_worker writes them to the database
+    queue_user(user.id, user.username, user.first_name, user.last_name, user.language_code)
     # Don't return anything - let other handlers process the update
 
 
+# Inline keyboard with button, built once and reused for every /start
+HELLO_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Run app", url=f"{os.getenv('APP_URL')}?mode=fullscreen")]
+])
+
+
 async def hello(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    # Create inline keyboard with button
-    app_url = os.getenv('APP_URL')
-    keyboard = [
-        [InlineKeyboardButton("Run app", url=f"{app_url}?mode=fullscreen")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await update.message.reply_text(
         f"Hello, {update.effective_user.first_name}. I'm xp7k, proceed to the app or ask me anything",
-        reply_markup=reply_markup
+        reply_markup=HELLO_MARKUP
     )
 
 
@@ -185,7 +422,7 @@ async def stream_ai_response(message_text: str, bot, chat_id: int, message_id: i
                                         last_edit_time = current_time
                                     except TelegramError as e:
                                         # If editing fails (e.g., message too long or same content), continue
-                                        print(f"Warning: Could not edit message: {e}")
+                                        log.warning("Could not edit message: %s", e)
                             
                             if data.get("done", False):
                                 break
@@ -254,39 +491,107 @@ async def post_init(app):
     # Delete webhook before starting polling to avoid conflicts
     try:
         await app.bot.delete_webhook(drop_pending_updates=True)
-        print("Webhook deleted (if it existed)")
-        # Small delay to ensure webhook deletion is processed
-        await asyncio.sleep(1)
+        log.info("Webhook deleted (if it existed)")
     except Exception as e:
-        print(f"Note: Could not delete webhook: {e}")
+        log.warning("Could not delete webhook: %s", e)
+    
+    # Wait until Telegram reports no webhook, usually already true on the first check
+    try:
+        for _ in range(10):
+            info = await app.bot.get_webhook_info()
+            if not info.url:
+                break
+            await asyncio.sleep(0.05)
+    except Exception as e:
+        log.warning("Could not check webhook status: %s", e)
     
     # Initialize database
     try:
         await init_db()
-        print("Database connection established")
+        log.info("Database connection established")
     except Exception as e:
-        print(f"Warning: Could not initialize database: {e}")
-        print("Bot will continue but user data won't be saved")
+        log.warning("Could not initialize database: %s", e)
+        log.warning("Bot will continue but user data won't be saved")
+    
+    # Start the single worker that writes users to the database
+    global _user_q, _batch_ready, _user_worker_task, _seen_filter_task
+    _user_q = asyncio.Queue(maxsize=USER_QUEUE_SIZE)
+    _batch_ready = asyncio.Event()
+    _user_worker_task = asyncio.create_task(user_worker())
+    _seen_filter_task = asyncio.create_task(seen_filter_loop())
 
 
-async def shutdown():
-    """Close database pool on shutdown"""
+async def stop_user_worker():
+    """Let the worker write the remaining and deferred users, then wait for it to stop"""
+    global _user_worker_stopping
+    _user_worker_stopping = True
+    # The worker gives up early if a write fails while stopping
+    while _deferred_users and not _user_worker_task.done():
+        _, row = _deferred_users.popitem()
+        await _user_q.put(row)
+    if not _user_worker_task.done():
+        await _user_q.put(None)
+    await _user_worker_task
+
+
+async def shutdown(app):
+    """Flush pending users and close database pool on shutdown"""
     global _db_pool
+    if _user_worker_task:
+        _seen_filter_task.cancel()
+        try:
+            await asyncio.wait_for(stop_user_worker(), USER_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning("Timed out writing remaining users on shutdown")
+            _user_worker_task.cancel()
     if _db_pool:
         await _db_pool.close()
-        print("Database connection closed")
+        log.info("Database connection closed")
+
+
+def setup_logging():
+    """Log through a queue so handlers never block the event loop on stdout writes.
+    
+    Returns the listener thread that writes the records; stop it on exit to flush them.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    # httpx logs every request at INFO, including each getUpdates poll
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
 
 
 def main():
+    listener = setup_logging()
+    try:
+        run_bot()
+    finally:
+        listener.stop()
+
+
+def run_bot():
     bot_token = os.getenv('BOT_TOKEN')
     if not bot_token:
         raise ValueError("Environment variable 'BOT_TOKEN' is not set")
     
+    # Use uvloop for faster task scheduling and socket I/O where available (not on Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     app = ApplicationBuilder().token(bot_token).post_init(post_init).post_shutdown(shutdown).build()
     
-    # Add handler to ensure user exists in DB on every message (non-blocking)
+    # Add handler to ensure user exists in DB on every real user action (non-blocking)
+    # Service messages (joins, pins, title changes, ...) carry no user activity and are skipped
     # This runs first, before command handlers
-    app.add_handler(MessageHandler(filters.ALL, ensure_user_handler), group=-1)
+    app.add_handler(MessageHandler(~filters.StatusUpdate.ALL, ensure_user_handler), group=-1)
+    app.add_handler(CallbackQueryHandler(ensure_user_handler), group=-1)
     
     # Add command handlers
     app.add_handler(CommandHandler("start", hello))
@@ -295,21 +600,19 @@ def main():
     # This should run after command handlers, so commands are processed first
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     
-    print("Bot starting...")
+    log.info("Bot starting...")
     try:
         app.run_polling(drop_pending_updates=True, allowed_updates=Update.ALL_TYPES)
     except Conflict as e:
-        print("Error: Another bot instance is already running or webhook conflict exists.")
-        print("This usually resolves automatically. If it persists, check for other running instances.")
-        print(f"Details: {e}")
+        log.error("Another bot instance is already running or webhook conflict exists.")
+        log.error("This usually resolves automatically. If it persists, check for other running instances.")
+        log.error("Details: %s", e)
         # Don't re-raise, just exit gracefully
         return
     except KeyboardInterrupt:
-        print("\nBot stopped by user")
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.info("Bot stopped by user")
+    except Exception:
+        log.exception("Error while running the bot")
 
 
 if __name__ == '__main__':